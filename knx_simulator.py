@@ -10,14 +10,32 @@ This simulates a basic KNXnet/IP gateway that responds to:
 - SEARCH_REQUEST/RESPONSE (added)
 
 Usage:
-    python3 knx_simulator.py [--port 3671] [--verbose]
+    python3 knx_simulator.py [--port 3671] [--verbose] [--asyncio | --io-uring] [--workers N]
+                             [--connected-channels] [--rcvbuf BYTES] [--reuseport] [--bind ADDR]
 """
 
 import socket
 import struct
 import argparse
+import asyncio
+import logging
 import time
-from datetime import datetime
+import ctypes
+import ctypes.util
+import errno
+import mmap
+import os
+import selectors
+import signal
+import multiprocessing
+import sys
+
+try:
+    import uvloop  # optional: libuv-based event loop for the asyncio backend
+except ImportError:
+    uvloop = None
+
+_logger = logging.getLogger('knxsim')
 
 # KNXnet/IP Service Type Identifiers
 SERVICE_SEARCH_REQUEST = 0x0201
@@ -35,50 +53,684 @@ SERVICE_TUNNELING_INDICATION = 0x0420  # for gateway->client indication
 # Status codes
 STATUS_OK = 0x00
 STATUS_NO_ERROR = 0x00
+STATUS_E_NO_MORE_CONNECTIONS = 0x24
+
+# Precompiled wire formats (avoids re-parsing format strings per packet)
+_HDR = struct.Struct('>BBHH')   # header_len, version, service_type, total_len
+_HPAI = struct.Struct('>BB4sH') # len, protocol, IPv4, port
+_CRD = struct.Struct('>BBH')    # len, connection type, KNX layer
+_BBBB = struct.Struct('BBBB')   # connection header
+_BB = struct.Struct('BB')
+_B = struct.Struct('B')
+_H = struct.Struct('!H')
+_CEMI_GROUP_WRITE = struct.Struct('>BBBBBBHBBB')  # 11-byte L_Data.ind GroupValue_Write
+
+# CONNECT_RESPONSE tail: HPAI (control endpoint, 0.0.0.0:0) + CRD (tunnel, link layer)
+_CONNECT_TAIL = _HPAI.pack(0x08, 0x01, b'\x00\x00\x00\x00', 0) + _CRD.pack(0x04, 0x04, 0x0200)
+
+# Receive batching: datagrams drained per wake-up and max datagram size
+RECV_BATCH_SIZE = 64
+RECV_BUFSIZE = 2048
+# Send batching: max datagrams handed to a single sendmmsg call
+SEND_BATCH_SIZE = 64
+# Max cached SEARCH_RESPONSE frames (one per distinct discovery target IP)
+SEARCH_CACHE_SIZE = 256
+# Socket buffer size requested for the server socket (absorbs bursts; capped by net.core.*mem_max)
+SOCKET_BUFSIZE = 4 * 1024 * 1024
+
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
+MSG_WAITFORONE = getattr(socket, 'MSG_WAITFORONE', 0x10000)  # Linux: block for the first datagram only
+
+
+# Linux recvmmsg(2)/sendmmsg(2) structures, used to move many datagrams per syscall
+class _IOVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class _SockaddrIn(ctypes.Structure):
+    _fields_ = [
+        ('sin_family', ctypes.c_ushort),
+        ('sin_port', ctypes.c_uint16),
+        ('sin_addr', ctypes.c_ubyte * 4),
+        ('sin_zero', ctypes.c_ubyte * 8),
+    ]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_IOVec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _recvmmsg = _libc.recvmmsg
+    _recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint,
+                          ctypes.c_int, ctypes.c_void_p]
+    _recvmmsg.restype = ctypes.c_int
+except (OSError, AttributeError, TypeError):
+    # Not Linux (or no usable libc; find_library('c') is None on Windows, which
+    # makes CDLL raise TypeError): fall back to one recvfrom per datagram
+    _recvmmsg = None
+
+try:
+    _sendmmsg = _libc.sendmmsg
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+except (NameError, AttributeError):
+    # Not Linux (or no usable libc): fall back to one sendto per datagram
+    _sendmmsg = None
+
+try:
+    _connect = _libc.connect
+    _connect.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint]
+    _connect.restype = ctypes.c_int
+except (NameError, AttributeError):
+    _connect = None
+
+
+def _udp_disconnect(sock):
+    """Dissolve a UDP socket's association (connect to AF_UNSPEC).
+
+    The kernel then also drops the source address picked by the previous
+    connect(), so the next connect() routes from scratch.
+    Raises OSError if the kernel refuses.
+    """
+    if _connect(sock.fileno(), ctypes.addressof(_SockaddrIn()), ctypes.sizeof(_SockaddrIn)) < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+class _Hex:
+    """Defers bytes.hex() of a frame until a log line actually formats it."""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return self.data.hex()
+
+
+def _buffer_address(buf):
+    """Address of a bytes/bytearray payload for an iovec; buf must stay alive until sent."""
+    if isinstance(buf, bytes):
+        return ctypes.cast(ctypes.c_char_p(buf), ctypes.c_void_p).value
+    return ctypes.addressof((ctypes.c_char * len(buf)).from_buffer(buf))
+
+
+class _MMsgArray:
+    """mmsghdr array with one iovec and one sockaddr_in per entry, wired up once."""
+
+    def __init__(self, n):
+        self.n = n
+        self.iovecs = (_IOVec * n)()
+        self.addrs = (_SockaddrIn * n)()
+        self.hdrs = (_MMsgHdr * n)()
+        for i in range(n):
+            self.addrs[i].sin_family = socket.AF_INET
+            hdr = self.hdrs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.addrs[i])
+            hdr.msg_namelen = ctypes.sizeof(_SockaddrIn)
+            hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            hdr.msg_iovlen = 1
+
+
+class _SendBatch(_MMsgArray):
+    """Pre-allocated sendmmsg(2) headers, refilled for every flush."""
+
+    def send(self, sock, frames):
+        """Send (frame, addr) pairs; return a list of (addr, OSError) for failed sends."""
+        failures = []
+        fd = sock.fileno()
+        for start in range(0, len(frames), self.n):
+            chunk = frames[start:start + self.n]
+            for i, (frame, addr) in enumerate(chunk):
+                self.iovecs[i].iov_base = _buffer_address(frame)
+                self.iovecs[i].iov_len = len(frame)
+                self.addrs[i].sin_port = socket.htons(addr[1])
+                self.addrs[i].sin_addr[:] = socket.inet_aton(addr[0])
+            sent = 0
+            while sent < len(chunk):
+                count = _sendmmsg(fd, ctypes.byref(self.hdrs[sent]), len(chunk) - sent, 0)
+                if count < 0:
+                    # errno refers to the first unsent datagram: report it and move past it
+                    err = ctypes.get_errno()
+                    failures.append((chunk[sent][1], OSError(err, os.strerror(err))))
+                    count = 1
+                sent += count
+        return failures
+
+
+class _RecvBatch(_MMsgArray):
+    """Pre-allocated recvmmsg(2) buffers, reused for every batch.
+
+    All ctypes arrays are built once, and datagrams are handed to the protocol
+    handlers as memoryview slices of the receive buffer, so the hot path copies
+    nothing. The views are only valid until the next call to recv().
+    """
+
+    def __init__(self, n, bufsize):
+        super().__init__(n)
+        self.bufsize = bufsize
+        self.bufs = ctypes.create_string_buffer(n * bufsize)
+        self.view = memoryview(self.bufs).cast('B')
+        base = ctypes.addressof(self.bufs)
+        for i in range(n):
+            self.iovecs[i].iov_base = base + i * bufsize
+            self.iovecs[i].iov_len = bufsize
+
+    def recv(self, sock, flags=MSG_DONTWAIT):
+        """Drain up to n datagrams in one syscall.
+
+        With MSG_DONTWAIT (default) this never blocks; with MSG_WAITFORONE on a
+        blocking socket it waits for the first datagram and then returns
+        whatever else is already queued.
+        """
+        namelen = ctypes.sizeof(_SockaddrIn)
+        for i in range(self.n):
+            self.hdrs[i].msg_hdr.msg_namelen = namelen
+        count = _recvmmsg(sock.fileno(), self.hdrs, self.n, flags, None)
+        if count < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return []
+            raise OSError(err, os.strerror(err))
+        batch = []
+        for i in range(count):
+            addr = self.addrs[i]
+            offset = i * self.bufsize
+            data = self.view[offset:offset + self.hdrs[i].msg_len]
+            client_addr = (socket.inet_ntoa(addr.sin_addr), socket.ntohs(addr.sin_port))
+            batch.append((data, client_addr))
+        return batch
+
+
+# io_uring (Linux >= 6.0): multishot recvmsg on a provided buffer ring, sendmsg SQEs for replies.
+# Driven through the raw syscalls so no liburing build is needed.
+_SYS_IO_URING_SETUP = 425
+_SYS_IO_URING_ENTER = 426
+_SYS_IO_URING_REGISTER = 427
+
+IORING_OFF_SQ_RING = 0
+IORING_OFF_SQES = 0x10000000
+IORING_FEAT_SINGLE_MMAP = 1 << 0
+IORING_SETUP_CQSIZE = 1 << 3
+IORING_SETUP_COOP_TASKRUN = 1 << 8
+IORING_SETUP_SINGLE_ISSUER = 1 << 12
+IORING_SETUP_DEFER_TASKRUN = 1 << 13
+IORING_ENTER_GETEVENTS = 1 << 0
+IORING_REGISTER_PBUF_RING = 22
+IORING_OP_SENDMSG = 9
+IORING_OP_RECVMSG = 10
+IOSQE_BUFFER_SELECT = 1 << 5
+IORING_RECV_MULTISHOT = 1 << 1
+IORING_CQE_F_BUFFER = 1 << 0
+IORING_CQE_F_MORE = 1 << 1
+IORING_CQE_BUFFER_SHIFT = 16
+
+URING_ENTRIES = 128     # SQ size; half of it are send slots
+URING_BUF_COUNT = 256   # provided buffers (power of two)
+URING_BUF_SIZE = 2048
+# Only this thread submits and completions are only reaped right after
+# io_uring_enter(GETEVENTS), so task work can be deferred to that call
+URING_SETUP_FLAGS = IORING_SETUP_COOP_TASKRUN | IORING_SETUP_SINGLE_ISSUER | IORING_SETUP_DEFER_TASKRUN
+URING_BUF_GROUP = 0
+_URING_RECV_TAG = 0     # user_data of the multishot recv; send slots use slot + 1
+
+try:
+    _syscall = _libc.syscall
+    _syscall.restype = ctypes.c_long
+except (NameError, AttributeError):
+    _syscall = None
+
+
+class _SQRingOffsets(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_uint32) for name in
+                ('head', 'tail', 'ring_mask', 'ring_entries', 'flags', 'dropped', 'array', 'resv1')]
+    _fields_ += [('user_addr', ctypes.c_uint64)]
+
+
+class _CQRingOffsets(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_uint32) for name in
+                ('head', 'tail', 'ring_mask', 'ring_entries', 'overflow', 'cqes', 'flags', 'resv1')]
+    _fields_ += [('user_addr', ctypes.c_uint64)]
+
+
+class _UringParams(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_uint32) for name in
+                ('sq_entries', 'cq_entries', 'flags', 'sq_thread_cpu', 'sq_thread_idle', 'features', 'wq_fd')]
+    _fields_ += [('resv', ctypes.c_uint32 * 3), ('sq_off', _SQRingOffsets), ('cq_off', _CQRingOffsets)]
+
+
+class _UringSQE(ctypes.Structure):
+    _fields_ = [
+        ('opcode', ctypes.c_uint8),
+        ('flags', ctypes.c_uint8),
+        ('ioprio', ctypes.c_uint16),
+        ('fd', ctypes.c_int32),
+        ('off', ctypes.c_uint64),
+        ('addr', ctypes.c_uint64),
+        ('len', ctypes.c_uint32),
+        ('op_flags', ctypes.c_uint32),
+        ('user_data', ctypes.c_uint64),
+        ('buf_group', ctypes.c_uint16),
+        ('personality', ctypes.c_uint16),
+        ('splice_fd_in', ctypes.c_int32),
+        ('addr3', ctypes.c_uint64),
+        ('pad2', ctypes.c_uint64),
+    ]
+
+
+class _UringCQE(ctypes.Structure):
+    _fields_ = [('user_data', ctypes.c_uint64), ('res', ctypes.c_int32), ('flags', ctypes.c_uint32)]
+
+
+class _UringBuf(ctypes.Structure):
+    # entry 0's resv field doubles as the ring tail
+    _fields_ = [('addr', ctypes.c_uint64), ('len', ctypes.c_uint32),
+                ('bid', ctypes.c_uint16), ('resv', ctypes.c_uint16)]
+
+
+class _UringBufReg(ctypes.Structure):
+    _fields_ = [('ring_addr', ctypes.c_uint64), ('ring_entries', ctypes.c_uint32),
+                ('bgid', ctypes.c_uint16), ('flags', ctypes.c_uint16), ('resv', ctypes.c_uint64 * 3)]
+
+
+class _RecvmsgOut(ctypes.Structure):
+    _fields_ = [('namelen', ctypes.c_uint32), ('controllen', ctypes.c_uint32),
+                ('payloadlen', ctypes.c_uint32), ('flags', ctypes.c_uint32)]
+
+
+def _mmap_address(mm):
+    return ctypes.addressof(ctypes.c_char.from_buffer(mm))
+
+
+def _uring_supported():
+    """True when the running kernel has multishot recvmsg (Linux >= 6.0) and libc exposes syscall()."""
+    if _syscall is None or not hasattr(os, 'uname') or os.uname().sysname != 'Linux':
+        return False
+    try:
+        major, minor = (int(part) for part in os.uname().release.split('.')[:2])
+    except ValueError:
+        return False
+    return (major, minor) >= (6, 0)
+
+
+class _UringUDP:
+    """Minimal io_uring driver for one UDP socket.
+
+    A single multishot RECVMSG keeps delivering datagrams into a ring of
+    provided buffers; replies go out as SENDMSG SQEs using pre-wired msghdrs.
+    Each loop iteration is one io_uring_enter() that both submits pending
+    SQEs and waits for completions. Completions are only read after that
+    syscall returns, which also orders them against the kernel's writes.
+    """
+
+    def __init__(self, sock, entries=URING_ENTRIES, buf_count=URING_BUF_COUNT, buf_size=URING_BUF_SIZE):
+        self.sock = sock
+        # CQ room for one completion per provided buffer plus every in-flight SENDMSG
+        cq_entries = buf_count + entries // 2
+        for setup_flags in (URING_SETUP_FLAGS, 0):
+            params = _UringParams(flags=setup_flags | IORING_SETUP_CQSIZE, cq_entries=cq_entries)
+            fd = _syscall(ctypes.c_long(_SYS_IO_URING_SETUP), ctypes.c_long(entries), ctypes.byref(params))
+            if fd >= 0:
+                break
+            err = ctypes.get_errno()
+            # EINVAL: kernel older than 6.1 does not know the setup flags, retry without
+            if err != errno.EINVAL or not setup_flags:
+                raise OSError(err, 'io_uring_setup: ' + os.strerror(err))
+        self.fd = fd
+        self._maps = []
+        try:
+            if not params.features & IORING_FEAT_SINGLE_MMAP:
+                raise OSError(errno.ENOSYS, 'io_uring without IORING_FEAT_SINGLE_MMAP')
+            self._map_rings(params)
+            self._setup_buffers(buf_count, buf_size)
+        except Exception:
+            self.close()
+            raise
+        # send slots: one msghdr/iovec/sockaddr per in-flight SENDMSG
+        self._tx = _MMsgArray(entries // 2)
+        self._tx_frames = [None] * self._tx.n
+        self._tx_free = list(range(self._tx.n))
+        self._to_submit = 0
+        self._recv_armed = False
+
+    def _map_rings(self, params):
+        sq_off, cq_off = params.sq_off, params.cq_off
+        ring_size = max(sq_off.array + params.sq_entries * 4,
+                        cq_off.cqes + params.cq_entries * ctypes.sizeof(_UringCQE))
+        flags = mmap.MAP_SHARED | getattr(mmap, 'MAP_POPULATE', 0x8000)
+        prot = mmap.PROT_READ | mmap.PROT_WRITE
+        ring = mmap.mmap(self.fd, ring_size, flags, prot, offset=IORING_OFF_SQ_RING)
+        self._maps.append(ring)
+        sqes = mmap.mmap(self.fd, params.sq_entries * ctypes.sizeof(_UringSQE), flags, prot,
+                         offset=IORING_OFF_SQES)
+        self._maps.append(sqes)
+
+        base = _mmap_address(ring)
+        self._sq_tail = ctypes.c_uint32.from_address(base + sq_off.tail)
+        self._sq_mask = ctypes.c_uint32.from_address(base + sq_off.ring_mask).value
+        self._sqes = (_UringSQE * params.sq_entries).from_address(_mmap_address(sqes))
+        sq_array = (ctypes.c_uint32 * params.sq_entries).from_address(base + sq_off.array)
+        for i in range(params.sq_entries):
+            sq_array[i] = i
+        self._cq_head = ctypes.c_uint32.from_address(base + cq_off.head)
+        self._cq_tail = ctypes.c_uint32.from_address(base + cq_off.tail)
+        self._cq_mask = ctypes.c_uint32.from_address(base + cq_off.ring_mask).value
+        self._cqes = (_UringCQE * params.cq_entries).from_address(base + cq_off.cqes)
+
+    def _setup_buffers(self, buf_count, buf_size):
+        self.buf_size = buf_size
+        self._pool = ctypes.create_string_buffer(buf_count * buf_size)
+        self._pool_addr = ctypes.addressof(self._pool)
+        self._pool_view = memoryview(self._pool).cast('B')
+
+        # the buffer ring must be page aligned: back it with an anonymous mapping
+        br = mmap.mmap(-1, buf_count * ctypes.sizeof(_UringBuf))
+        self._maps.append(br)
+        br_addr = _mmap_address(br)
+        self._br = (_UringBuf * buf_count).from_address(br_addr)
+        self._br_tail = ctypes.c_uint16.from_address(br_addr + _UringBuf.resv.offset)
+        self._br_mask = buf_count - 1
+        reg = _UringBufReg(ring_addr=br_addr, ring_entries=buf_count, bgid=URING_BUF_GROUP)
+        self._register(IORING_REGISTER_PBUF_RING, ctypes.byref(reg), 1)
+        for bid in range(buf_count):
+            self._buf_ring_add(bid, bid)
+        self._br_tail.value = buf_count & 0xFFFF
+
+        # recvmsg template: the kernel lays out recvmsg_out + name + payload in each buffer
+        self._recv_msghdr = _MsgHdr(msg_namelen=ctypes.sizeof(_SockaddrIn))
+        self._payload_offset = ctypes.sizeof(_RecvmsgOut) + ctypes.sizeof(_SockaddrIn)
+
+    def _register(self, opcode, arg, nr_args):
+        ret = _syscall(ctypes.c_long(_SYS_IO_URING_REGISTER), ctypes.c_long(self.fd),
+                       ctypes.c_long(opcode), arg, ctypes.c_long(nr_args))
+        if ret < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, 'io_uring_register: ' + os.strerror(err))
+
+    def _buf_ring_add(self, bid, offset):
+        entry = self._br[(self._br_tail.value + offset) & self._br_mask]
+        entry.addr = self._pool_addr + bid * self.buf_size
+        entry.len = self.buf_size
+        entry.bid = bid
+
+    def release(self, bid):
+        """Hand a receive buffer back to the kernel once its datagram has been processed."""
+        self._buf_ring_add(bid, 0)
+        self._br_tail.value = (self._br_tail.value + 1) & 0xFFFF
+
+    def _get_sqe(self):
+        tail = self._sq_tail.value + self._to_submit
+        sqe = self._sqes[tail & self._sq_mask]
+        ctypes.memset(ctypes.addressof(sqe), 0, ctypes.sizeof(_UringSQE))
+        self._to_submit += 1
+        return sqe
+
+    def _arm_recv(self):
+        sqe = self._get_sqe()
+        sqe.opcode = IORING_OP_RECVMSG
+        sqe.fd = self.sock.fileno()
+        sqe.addr = ctypes.addressof(self._recv_msghdr)
+        sqe.len = 1
+        sqe.ioprio = IORING_RECV_MULTISHOT
+        sqe.flags = IOSQE_BUFFER_SELECT
+        sqe.buf_group = URING_BUF_GROUP
+        sqe.user_data = _URING_RECV_TAG
+        self._recv_armed = True
+
+    def send(self, frames):
+        """Queue SENDMSG SQEs for (frame, addr) pairs; return the pairs that found no free slot."""
+        overflow = []
+        for frame, addr in frames:
+            if not self._tx_free or self._to_submit >= self._sq_mask:
+                overflow.append((frame, addr))
+                continue
+            slot = self._tx_free.pop()
+            self._tx_frames[slot] = frame  # keep the buffer alive until completion
+            iov = self._tx.iovecs[slot]
+            iov.iov_base = _buffer_address(frame)
+            iov.iov_len = len(frame)
+            self._tx.addrs[slot].sin_port = socket.htons(addr[1])
+            self._tx.addrs[slot].sin_addr[:] = socket.inet_aton(addr[0])
+            sqe = self._get_sqe()
+            sqe.opcode = IORING_OP_SENDMSG
+            sqe.fd = self.sock.fileno()
+            sqe.addr = ctypes.addressof(self._tx.hdrs[slot].msg_hdr)
+            sqe.len = 1
+            sqe.user_data = slot + 1
+        return overflow
+
+    def wait(self):
+        """Submit queued SQEs, wait for at least one completion and reap them all.
+
+        Returns (received, send_errors): received is a list of
+        (data, client_addr, bid) with data a memoryview into buffer bid,
+        which must be passed to release() after use; send_errors is a list
+        of (addr, OSError) for failed SENDMSGs.
+        """
+        if not self._recv_armed:
+            self._arm_recv()
+        self._sq_tail.value = (self._sq_tail.value + self._to_submit) & 0xFFFFFFFF
+        submitted, self._to_submit = self._to_submit, 0
+        ret = _syscall(ctypes.c_long(_SYS_IO_URING_ENTER), ctypes.c_long(self.fd), ctypes.c_long(submitted),
+                       ctypes.c_long(1), ctypes.c_long(IORING_ENTER_GETEVENTS), None, ctypes.c_long(0))
+        if ret < 0:
+            err = ctypes.get_errno()
+            if err not in (errno.EINTR, errno.EAGAIN, errno.EBUSY):
+                raise OSError(err, 'io_uring_enter: ' + os.strerror(err))
+
+        received = []
+        send_errors = []
+        head = self._cq_head.value
+        tail = self._cq_tail.value
+        while head != tail:
+            cqe = self._cqes[head & self._cq_mask]
+            user_data, res, flags = cqe.user_data, cqe.res, cqe.flags
+            head = (head + 1) & 0xFFFFFFFF
+            if user_data != _URING_RECV_TAG:
+                slot = user_data - 1
+                if res < 0:
+                    addr = self._tx.addrs[slot]
+                    send_errors.append(((socket.inet_ntoa(addr.sin_addr), socket.ntohs(addr.sin_port)),
+                                        OSError(-res, os.strerror(-res))))
+                self._tx_frames[slot] = None
+                self._tx_free.append(slot)
+                continue
+            if not flags & IORING_CQE_F_MORE:
+                # multishot recv terminated (e.g. -ENOBUFS): re-arm on the next wait()
+                self._recv_armed = False
+            if res < 0 or not flags & IORING_CQE_F_BUFFER:
+                continue
+            bid = flags >> IORING_CQE_BUFFER_SHIFT
+            offset = bid * self.buf_size
+            out = _RecvmsgOut.from_address(self._pool_addr + offset)
+            addr = _SockaddrIn.from_address(self._pool_addr + offset + ctypes.sizeof(_RecvmsgOut))
+            start = offset + self._payload_offset
+            data = self._pool_view[start:start + out.payloadlen]
+            client_addr = (socket.inet_ntoa(addr.sin_addr), socket.ntohs(addr.sin_port))
+            received.append((data, client_addr, bid))
+        self._cq_head.value = head
+        return received, send_errors
+
+    def close(self):
+        for mm in self._maps:
+            mm.close()
+        self._maps = []
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
 
 class KNXSimulator:
-    def __init__(self, port=3671, verbose=False):
+    def __init__(self, port=3671, verbose=False, worker_id=0, workers=1, connected_channels=False,
+                 rcvbuf=SOCKET_BUFSIZE, reuseport=False, bind='0.0.0.0'):
         self.port = port
+        self.bind = bind
         self.verbose = verbose
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.worker_id = worker_id
+        self.workers = workers
+        self.connected_channels = connected_channels
+        self.rcvbuf = rcvbuf
+        # multiple workers share the port; on Linux the kernel spreads clients across them.
+        # Per-channel connected sockets join the same SO_REUSEPORT group.
+        self.sock = self._bind_socket(reuseport=reuseport or workers > 1 or connected_channels)
+        self.selector = None
+        self.peer_socks = {}  # client_addr -> connected socket (connected_channels only)
+        if _recvmmsg:
+            self._rx = _RecvBatch(RECV_BATCH_SIZE, RECV_BUFSIZE)
+        else:
+            self._rx = None
+            self._rx_view = memoryview(bytearray(RECV_BATCH_SIZE * RECV_BUFSIZE))
+        self._tx = _SendBatch(SEND_BATCH_SIZE) if _sendmmsg else None
+        # Tunnel channels, indexed by the 1-byte channel id: client address (None = free)
+        # and next outgoing sequence counter
+        self._ch_addr = [None] * 256
+        self._ch_seq = bytearray(256)
+        # (frame, addr) pairs not addressed to the requester (indications, search
+        # responses); flushed together with the replies of the current batch
+        self._outbox = []
+        # channel ids are partitioned across workers (1 + worker_id, stepping by workers)
+        self.next_channel = 1 + worker_id
+        # service_type -> handler(body, client_addr) returning the reply frame or None
+        # (frames for other destinations go through self._outbox)
+        self._dispatch = {
+            SERVICE_CONNECT_REQUEST: self.handle_connect_request,
+            SERVICE_DISCONNECT_REQUEST: self.handle_disconnect_request,
+            SERVICE_TUNNELING_REQUEST: self.handle_tunneling_request,
+            SERVICE_CONNECTIONSTATE_REQUEST: self.handle_connectionstate_request,
+            SERVICE_SEARCH_REQUEST: self.handle_search_request,
+            SERVICE_TUNNELING_ACK: self.handle_tunneling_ack,
+        }
+        self._log_sec = None
+        self._log_prefix = ''
+        # Fixed-size response templates: only channel id / connection header bytes change
+        self._connect_tmpl = bytearray(self.build_header(SERVICE_CONNECT_RESPONSE, 2 + len(_CONNECT_TAIL))
+                                       + _BB.pack(0, STATUS_OK) + _CONNECT_TAIL)
+        self._connstate_tmpl = bytearray(self.build_header(SERVICE_CONNECTIONSTATE_RESPONSE, 2) + _BB.pack(0, STATUS_OK))
+        self._disconnect_tmpl = bytearray(self.build_header(SERVICE_DISCONNECT_RESPONSE, 2) + _BB.pack(0, STATUS_OK))
+        self._tunneling_ack_tmpl = bytearray(self.build_header(SERVICE_TUNNELING_ACK, 5) + bytes(4) + _B.pack(STATUS_OK))
+        # Unbound UDP socket re-connect()ed per discovery target to find the outgoing interface
+        self._probe_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # target IP -> (advertised server IP, SEARCH_RESPONSE frame); bounded by SEARCH_CACHE_SIZE
+        self._search_resp = {}
+        # bound to a specific address: that is the only one we can answer from
+        self._search_static = None
+        if bind != '0.0.0.0':
+            self._search_static = (bind, _HDR.pack(0x06, 0x10, SERVICE_SEARCH_RESPONSE, _HDR.size + _HPAI.size)
+                                   + _HPAI.pack(0x08, 0x01, socket.inet_aton(bind), self.port))
+        # Ready-made heartbeat / disconnect responses per open channel
+        self._connstate_resp = {}
+        self._disconnect_resp = {}
+
+    def _bind_socket(self, reuseport=False):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         # allow reuse of address when restarting
         try:
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         except Exception:
             pass
-        self.sock.bind(('0.0.0.0', port))
-        self.channels = {}  # channel_id -> (client_addr, sequence_counter)
-        self.next_channel = 1
+        if reuseport:
+            if not hasattr(socket, 'SO_REUSEPORT'):
+                sock.close()
+                raise OSError(errno.ENOPROTOOPT, 'SO_REUSEPORT is not available on this platform')
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if self.rcvbuf:
+            for opt in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, opt, self.rcvbuf)
+                except OSError as e:
+                    _logger.warning(f"Warning: could not set socket buffer size to {self.rcvbuf}: {e}")
+        sock.bind((self.bind, self.port))
+        sock.setblocking(False)
+        return sock
+
+    def _open_peer_socket(self, client_addr):
+        """Connect a socket on our port to client_addr.
 
-    def log(self, msg):
+        Linux prefers a connected socket over the wildcard one for that peer's
+        datagrams (early demux, no full UDP lookup), and replies go out with
+        send() without a destination address. The source port stays self.port.
+        """
+        if client_addr in self.peer_socks:
+            return
+        try:
+            csock = self._bind_socket(reuseport=True)
+            csock.connect(client_addr)
+        except OSError as e:
+            self.log("  → Connected socket for %s failed: %s", client_addr, e)
+            return
+        self.peer_socks[client_addr] = csock
+        self.selector.register(csock, selectors.EVENT_READ)
+
+    def _close_peer_socket(self, client_addr):
+        if client_addr in self._ch_addr:
+            return
+        csock = self.peer_socks.pop(client_addr, None)
+        if csock is not None:
+            self.selector.unregister(csock)
+            csock.close()
+
+    def _drop_peer_socket(self, csock, err):
+        """Forget a connected socket whose peer is gone.
+
+        A connected UDP socket reports ICMP errors for its peer (e.g.
+        ECONNREFUSED once the client closed its port) on the next receive;
+        that only concerns this peer, so its traffic falls back to self.sock.
+        """
+        for addr, sock in self.peer_socks.items():
+            if sock is csock:
+                del self.peer_socks[addr]
+                self.log("  → Connected socket for %s dropped: %s", addr, err)
+                break
+        self.selector.unregister(csock)
+        csock.close()
+
+    def log(self, msg, *args):
+        """Log msg % args when verbose; args are only formatted when the line is emitted."""
         if self.verbose:
-            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            print(f"[{timestamp}] {msg}")
+            if args:
+                msg = msg % args
+            now = time.time()
+            sec = int(now)
+            # strftime only once per second; bursts of frames reuse the cached prefix
+            if sec != self._log_sec:
+                self._log_sec = sec
+                self._log_prefix = time.strftime("%H:%M:%S", time.localtime(now))
+            # the handler formats '%(message)s' only, so no per-record time formatting
+            _logger.info(f"[{self._log_prefix}.{int((now - sec) * 1000):03d}] {msg}")
 
     def parse_header(self, data):
         """Parse KNXnet/IP header.
         Header layout used here: header_len (1), version (1), service_type (2), total_length (2)
-        The function returns a dict with parsed fields and body bytes (data after header).
+        header_len and version are constant and not checked, so only the two 16-bit
+        fields are read. The function returns (service_type, body), with the body
+        (data after header) as a zero-copy memoryview, or None if data is too short.
         """
         if len(data) < 6:
             return None
-        try:
-            header_len, protocol_version, service_type, total_len = struct.unpack('>BBHH', data[:6])
-        except Exception:
-            return None
-        body = data[6:6 + (total_len - 6)] if total_len >= 6 else data[6:]
-        return {
-            'header_len': header_len,
-            'version': protocol_version,
-            'service_type': service_type,
-            'total_len': total_len,
-            'body': body
-        }
+        service_type = (data[2] << 8) | data[3]
+        total_len = (data[4] << 8) | data[5]
+        mv = memoryview(data)
+        body = mv[6:total_len] if total_len >= 6 else mv[6:]
+        return service_type, body
 
     def build_header(self, service_type, body_len):
         """Build KNXnet/IP header using same layout used in parse_header."""
         total_len = 6 + body_len
-        return struct.pack('>BBHH', 0x06, 0x10, service_type, total_len)
+        return _HDR.pack(0x06, 0x10, service_type, total_len)
 
     def handle_search_request(self, data, client_addr):
         """Handle SEARCH Request and send a SearchResponse to the HPAI declared in the request.
@@ -86,93 +738,139 @@ class KNXSimulator:
         HPAI: len (1), protocol (1=IPv4 UDP), IPv4(4), port(2)
         If present, we send the SearchResponse to that HPAI. Otherwise, respond to the source.
         """
-        self.log(f"SEARCH_REQUEST from {client_addr}")
+        self.log("SEARCH_REQUEST from %s", client_addr)
         target_ip, target_port = client_addr
 
         # parse first HPAI if present
         if len(data) >= 8:
             try:
-                hpai_len = data[0]
-                proto = data[1]
+                hpai_len, proto, ip_bytes, port = _HPAI.unpack_from(data)
                 if hpai_len == 8 and proto == 1:
-                    ip_bytes = data[2:6]
-                    port = struct.unpack('!H', data[6:8])[0]
                     target_ip = socket.inet_ntoa(ip_bytes)
                     target_port = port
             except Exception:
                 pass
 
-        # compute server IP to advertise (choose interface used to reach target)
-        try:
-            tmp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            tmp.connect((target_ip, target_port))
-            server_ip = tmp.getsockname()[0]
-            tmp.close()
-        except Exception:
-            server_ip = '0.0.0.0'
+        cached = self._search_static or self._search_resp.get(target_ip)
+        if cached is None:
+            # compute server IP to advertise (choose interface used to reach target);
+            # the route depends only on the target IP, so the frame is cached per IP
+            try:
+                try:
+                    if _connect is None:
+                        raise OSError(errno.ENOSYS, 'connect(AF_UNSPEC) unavailable')
+                    _udp_disconnect(self._probe_sock)
+                except OSError:
+                    # a fresh socket carries no route or source address from the last probe
+                    self._probe_sock.close()
+                    self._probe_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._probe_sock.connect((target_ip, target_port))
+                server_ip = self._probe_sock.getsockname()[0]
+                routed = True
+            except Exception:
+                server_ip = '0.0.0.0'
+                routed = False
 
-        # build body: HPAI of server (len=8, proto=1, ipv4, port)
-        body = struct.pack('>BB4sH', 0x08, 0x01, socket.inet_aton(server_ip), self.port)
-        header = self.build_header(SERVICE_SEARCH_RESPONSE, len(body))
-        response = header + body
+            # header + HPAI of server (len=8, proto=1, ipv4, port), packed in place
+            response = bytearray(_HDR.size + _HPAI.size)
+            _HDR.pack_into(response, 0, 0x06, 0x10, SERVICE_SEARCH_RESPONSE, len(response))
+            _HPAI.pack_into(response, _HDR.size, 0x08, 0x01, socket.inet_aton(server_ip), self.port)
 
-        try:
-            self.sock.sendto(response, (target_ip, target_port))
-            self.log(f"  → SEARCH_RESPONSE sent to {target_ip}:{target_port} advertising {server_ip}:{self.port}")
-        except Exception as e:
-            self.log(f"  → Failed to send SEARCH_RESPONSE: {e}")
+            cached = (server_ip, bytes(response))
+            # a failed probe may be a transient routing problem: retry it next time
+            if routed:
+                if len(self._search_resp) >= SEARCH_CACHE_SIZE:
+                    self._search_resp.clear()
+                self._search_resp[target_ip] = cached
+        server_ip, response = cached
+
+        self._outbox.append((response, (target_ip, target_port)))
+        self.log("  → SEARCH_RESPONSE to %s:%d advertising %s:%d", target_ip, target_port, server_ip, self.port)
+        return None
 
     def handle_connect_request(self, data, client_addr):
-        self.log(f"CONNECT_REQUEST from {client_addr}")
-        channel_id = self.next_channel
-        self.channels[channel_id] = (client_addr, 0)
-        self.next_channel += 1
-
-        # Build CONNECT_RESPONSE body
-        body = struct.pack('BB', channel_id, STATUS_OK)
-        # HPAI (control endpoint) + CRD
-        body += struct.pack('>BB4sH', 0x08, 0x01, b'\x00\x00\x00\x00', 0)
-        body += struct.pack('>BBH', 0x04, 0x04, 0x0200)
-
-        header = self.build_header(SERVICE_CONNECT_RESPONSE, len(body))
-        response = header + body
-        self.log(f"  → CONNECT_RESPONSE: channel={channel_id}")
+        self.log("CONNECT_REQUEST from %s", client_addr)
+        channel_id = self._alloc_channel()
+        if channel_id is None:
+            self.log("  → CONNECT_RESPONSE: no free channel")
+            return self.build_header(SERVICE_CONNECT_RESPONSE, 2) + _BB.pack(0, STATUS_E_NO_MORE_CONNECTIONS)
+        self._ch_addr[channel_id] = client_addr
+        self._ch_seq[channel_id] = 0
+        if self.connected_channels:
+            self._open_peer_socket(client_addr)
+
+        # CONNECT_RESPONSE: channel id + status, then the constant HPAI + CRD tail
+        self._connect_tmpl[6] = channel_id
+        self._connstate_tmpl[6] = channel_id
+        self._connstate_resp[channel_id] = bytes(self._connstate_tmpl)
+        self._disconnect_tmpl[6] = channel_id
+        self._disconnect_resp[channel_id] = bytes(self._disconnect_tmpl)
+        response = bytes(self._connect_tmpl)
+        self.log("  → CONNECT_RESPONSE: channel=%d", channel_id)
         return response
 
+    def _alloc_channel(self):
+        """Return the next free channel id of this worker (ids wrap below 256), or None."""
+        channel_id = start = self.next_channel
+        while True:
+            following = channel_id + self.workers
+            if following > 255:
+                following = 1 + self.worker_id
+            if self._ch_addr[channel_id] is None:
+                self.next_channel = following
+                return channel_id
+            channel_id = following
+            if channel_id == start:
+                return None
+
     def handle_disconnect_request(self, data, client_addr):
         if len(data) < 2:
             return None
-        channel_id, status = struct.unpack('BB', data[:2])
-        self.log(f"DISCONNECT_REQUEST: channel={channel_id}")
-        if channel_id in self.channels:
-            del self.channels[channel_id]
-        body = struct.pack('BB', channel_id, STATUS_OK)
-        header = self.build_header(SERVICE_DISCONNECT_RESPONSE, len(body))
-        return header + body
+        channel_id, status = _BB.unpack_from(data)
+        self.log("DISCONNECT_REQUEST: channel=%d", channel_id)
+        channel_addr = self._ch_addr[channel_id]
+        if channel_addr is not None:
+            self._ch_addr[channel_id] = None
+            # the peer socket belongs to the channel's endpoint, not necessarily the sender
+            if self.peer_socks:
+                self._close_peer_socket(channel_addr)
+        self._connstate_resp.pop(channel_id, None)
+        response = self._disconnect_resp.pop(channel_id, None)
+        if response is None:
+            self._disconnect_tmpl[6] = channel_id
+            response = bytes(self._disconnect_tmpl)
+        return response
 
     def handle_tunneling_request(self, data, client_addr):
         if len(data) < 4:
             return None
-        conn_header = data[:4]
-        header_len, channel_id, sequence, reserved = struct.unpack('BBBB', conn_header)
+        header_len, channel_id, sequence, reserved = _BBBB.unpack_from(data)
         cemi_data = data[4:]
-        self.log(f"TUNNELING_REQUEST: channel={channel_id}, seq={sequence}, cemi_len={len(cemi_data)}")
+        self.log("TUNNELING_REQUEST: channel=%d, seq=%d, cemi_len=%d", channel_id, sequence, len(cemi_data))
 
         # build ACK (connection header + status)
-        body = conn_header + struct.pack('B', STATUS_OK)
-        header = self.build_header(SERVICE_TUNNELING_ACK, len(body))
-        response = header + body
-        self.log(f"  → TUNNELING_ACK: seq={sequence}")
+        self._tunneling_ack_tmpl[6:10] = data[:4]
+        response = bytes(self._tunneling_ack_tmpl)
+        self.log("  → TUNNELING_ACK: seq=%d", sequence)
 
         # Send TUNNELING_INDICATION only for GroupWrite commands (realistic gateway behavior)
         # Real KNX gateways echo GroupWrite commands back immediately (within milliseconds)
         # GroupRead commands don't get echoed - they wait for a response from another device
         if len(cemi_data) > 0 and self.is_group_write(cemi_data):
             self.send_tunneling_indication(channel_id, cemi_data)
-            self.log(f"  → TUNNELING_INDICATION sent (echo of GroupWrite)")
+            self.log("  → TUNNELING_INDICATION sent (echo of GroupWrite)")
 
         return response
 
+    def handle_tunneling_ack(self, data, client_addr):
+        # Client acknowledges our TUNNELING_INDICATION - this is expected
+        if len(data) >= 4:
+            header_len, channel_id, sequence, status = _BBBB.unpack_from(data)
+            self.log("TUNNELING_ACK received: channel=%d, seq=%d, status=%d", channel_id, sequence, status)
+        else:
+            self.log("TUNNELING_ACK received (short frame)")
+        return None
+
     def is_group_write(self, cemi_data):
         """Check if cEMI frame is a GroupWrite command.
 
@@ -186,156 +884,331 @@ class KNXSimulator:
         - 0x40 = GroupValue_Response
         - 0x80 = GroupValue_Write
         """
-        if len(cemi_data) < 10:  # Minimum valid cEMI frame
-            self.log(f"  [DEBUG] cEMI too short: {len(cemi_data)} bytes (need >= 10)")
+        if len(cemi_data) < 11:  # Minimum valid cEMI frame with TPCI/APCI + data byte
             return False
-
-        try:
-            # Debug: print full cEMI frame
-            self.log(f"  [DEBUG] cEMI hex: {cemi_data.hex()}")
-
-            # Parse cEMI structure
-            msg_code = cemi_data[0]
-            add_info_len = cemi_data[1]
-
-            self.log(f"  [DEBUG] Message code: 0x{msg_code:02X}, Add info len: {add_info_len}")
-
-            # Calculate TPCI/APCI position accounting for additional info
-            # Base structure: msg_code(1) + add_info_len(1) + add_info(N) + ctrl1(1) + ctrl2(1) + src(2) + dst(2) + npdu_len(1) + tpci_apci(1)
-            tpci_apci_pos = 2 + add_info_len + 1 + 1 + 2 + 2 + 1  # = 9 + add_info_len
-
-            if len(cemi_data) <= tpci_apci_pos:
-                self.log(f"  [DEBUG] cEMI too short for TPCI/APCI at pos {tpci_apci_pos}")
-                return False
-
-            # In KNX cEMI, the APCI is split across two bytes:
-            # Byte 9 (tpci_apci_pos): TPCI + upper 2 bits of APCI
-            # Byte 10 (tpci_apci_pos + 1): lower 4 bits of APCI + data
-            #
-            # For GroupValue commands:
-            # - GroupValue_Read: APCI = 0x0000
-            # - GroupValue_Response: APCI = 0x0040
-            # - GroupValue_Write: APCI = 0x0080
-            #
-            # The APCI upper bits are in byte 9, bits 0-1 (mask 0x03)
-            tpci_apci_byte = cemi_data[tpci_apci_pos]
-            apci_upper = (tpci_apci_byte & 0x03) << 6  # Get bits 0-1 and shift to position
-
-            # Next byte contains lower APCI bits and data
-            if len(cemi_data) <= tpci_apci_pos + 1:
-                self.log(f"  [DEBUG] cEMI missing APCI+data byte")
-                return False
-
-            apci_data_byte = cemi_data[tpci_apci_pos + 1]
-            apci_lower = apci_data_byte & 0xC0  # Upper 2 bits of data byte
-
-            apci = apci_upper | apci_lower
-
-            self.log(f"  [DEBUG] TPCI byte at pos {tpci_apci_pos}: 0x{tpci_apci_byte:02X}")
-            self.log(f"  [DEBUG] APCI+data byte at pos {tpci_apci_pos + 1}: 0x{apci_data_byte:02X}")
-            self.log(f"  [DEBUG] Combined APCI: 0x{apci:02X} (upper: 0x{apci_upper:02X}, lower: 0x{apci_lower:02X})")
-
-            is_write = apci == 0x80
-            self.log(f"  [DEBUG] Is GroupWrite? {is_write}")
-
-            return is_write
-        except Exception as e:
-            self.log(f"  [DEBUG] Exception in is_group_write: {e}")
+        # msg_code(1) + add_info_len(1) + add_info(N) + ctrl1(1) + ctrl2(1) + src(2) + dst(2) + npdu_len(1)
+        pos = 9 + cemi_data[1]
+        if len(cemi_data) < pos + 2:
             return False
+        # 10-bit APCI: low 2 bits of the TPCI byte + top 2 bits of the following byte
+        (apci_word,) = _H.unpack_from(cemi_data, pos)
+        is_write = (apci_word & 0x03C0) == 0x0080
+        self.log("  [DEBUG] cEMI %s: APCI word 0x%04X, GroupWrite=%s", _Hex(cemi_data), apci_word, is_write)
+        return is_write
 
     def handle_connectionstate_request(self, data, client_addr):
         if len(data) < 2:
             return None
-        channel_id, reserved = struct.unpack('BB', data[:2])
-        self.log(f"CONNECTIONSTATE_REQUEST: channel={channel_id}")
-        body = struct.pack('BB', channel_id, STATUS_OK)
-        header = self.build_header(SERVICE_CONNECTIONSTATE_RESPONSE, len(body))
-        return header + body
+        channel_id, reserved = _BB.unpack_from(data)
+        self.log("CONNECTIONSTATE_REQUEST: channel=%d", channel_id)
+        response = self._connstate_resp.get(channel_id)
+        if response is None:
+            self._connstate_tmpl[6] = channel_id
+            response = bytes(self._connstate_tmpl)
+        return response
 
     def build_cemi_group_write(self, group_addr, value_bool):
-        cemi = bytearray()
-        cemi.append(0x29)  # L_Data.ind
-        cemi.append(0x00)  # additional info len
-        cemi.append(0xBC)  # control field 1
-        cemi.append(0xE0)  # control field 2
-        cemi.extend([0x11, 0xFA])  # source 1.1.250
-        cemi.extend(struct.pack('>H', group_addr))
-        cemi.append(0x01)  # NPDU length
-        cemi.append(0x00)  # TPCI/APCI
+        # L_Data.ind, no additional info, ctrl1 0xBC, ctrl2 0xE0, source 1.1.250,
+        # destination group address, NPDU length 1, TPCI/APCI, APCI + 1-bit value
         apci_data = 0x81 if value_bool else 0x80
-        cemi.append(apci_data)
-        return bytes(cemi)
+        return _CEMI_GROUP_WRITE.pack(0x29, 0x00, 0xBC, 0xE0, 0x11, 0xFA, group_addr, 0x01, 0x00, apci_data)
 
     def send_tunneling_indication(self, channel_id, cemi_data):
-        if channel_id not in self.channels:
+        client_addr = self._ch_addr[channel_id]
+        if client_addr is None:
             return
-        client_addr, sequence = self.channels[channel_id]
-        conn_header = struct.pack('BBBB', 0x04, channel_id, sequence, 0x00)
-        body = conn_header + cemi_data
-        header = self.build_header(SERVICE_TUNNELING_INDICATION, len(body))
-        frame = header + body
-        self.sock.sendto(frame, client_addr)
-        self.channels[channel_id] = (client_addr, (sequence + 1) % 256)
-        self.log(f"  → TUNNELING_INDICATION: channel={channel_id}, seq={sequence}")
+        sequence = self._ch_seq[channel_id]
+        # header + connection header + cEMI, assembled in one preallocated buffer
+        frame = bytearray(10 + len(cemi_data))
+        _HDR.pack_into(frame, 0, 0x06, 0x10, SERVICE_TUNNELING_INDICATION, len(frame))
+        _BBBB.pack_into(frame, 6, 0x04, channel_id, sequence, 0x00)
+        frame[10:] = cemi_data
+        self._outbox.append((frame, client_addr))
+        self._ch_seq[channel_id] = (sequence + 1) & 0xFF
+        self.log("  → TUNNELING_INDICATION: channel=%d, seq=%d", channel_id, sequence)
 
-    def run(self):
+    def _recv_batch(self, sock):
+        """Return up to RECV_BATCH_SIZE pending (data, client_addr) datagrams from sock without blocking.
+
+        Uses a single recvmmsg(2) call on Linux; elsewhere falls back to
+        one recvfrom_into per datagram until the socket would block. Data is
+        returned as memoryviews into a reused buffer, valid until the next call.
+        """
+        if self._rx is not None:
+            return self._rx.recv(sock)
+        batch = []
+        try:
+            while len(batch) < RECV_BATCH_SIZE:
+                offset = len(batch) * RECV_BUFSIZE
+                nbytes, client_addr = sock.recvfrom_into(self._rx_view[offset:offset + RECV_BUFSIZE])
+                batch.append((self._rx_view[offset:offset + nbytes], client_addr))
+        except (BlockingIOError, InterruptedError):
+            pass
+        return batch
+
+    def _send_batch(self, frames):
+        """Send a list of (frame, addr) pairs, with one sendmmsg(2) call per SEND_BATCH_SIZE frames on Linux."""
+        failures = []
+        if self.peer_socks:
+            # peers with a connected socket get a plain send() on it
+            unconnected = []
+            for frame, addr in frames:
+                csock = self.peer_socks.get(addr)
+                if csock is None:
+                    unconnected.append((frame, addr))
+                    continue
+                try:
+                    csock.send(frame)
+                except OSError as e:
+                    failures.append((addr, e))
+            frames = unconnected
+        if self._tx is not None:
+            failures += self._tx.send(self.sock, frames)
+        else:
+            for frame, addr in frames:
+                try:
+                    self.sock.sendto(frame, addr)
+                except OSError as e:
+                    failures.append((addr, e))
+        for addr, e in failures:
+            self.log("  → Failed to send to %s: %s", addr, e)
+
+    def process_datagram(self, data, client_addr):
+        """Parse one received datagram and dispatch it; return the reply frame (if any)."""
+        self.log("[RAW] Received %d bytes from %s", len(data), client_addr)
+        self.log("      Hex: %s", _Hex(data))
+
+        parsed = self.parse_header(data)
+        if parsed is None:
+            self.log("Invalid frame from %s", client_addr)
+            return None
+
+        service_type, body = parsed
+        handler = self._dispatch.get(service_type)
+        if handler is None:
+            self.log("Unknown service type: 0x%04X", service_type)
+            return None
+        return handler(body, client_addr)
+
+    def _collect(self, data, client_addr, replies):
+        """Process one datagram, appending its reply and any queued outbox frames to replies."""
+        response = self.process_datagram(data, client_addr)
+        if response:
+            replies.append((response, client_addr))
+        if self._outbox:
+            replies.extend(self._outbox)
+            self._outbox.clear()
+
+    def _process_batch(self, batch):
+        """Process received datagrams and flush all resulting frames in one send batch."""
+        replies = []
+        for data, client_addr in batch:
+            self._collect(data, client_addr, replies)
+        if replies:
+            self._send_batch(replies)
+
+    def print_banner(self):
         print(f"=== KNX Gateway Simulator ===")
-        print(f"Listening on 0.0.0.0:{self.port}")
+        print(f"Listening on {self.bind}:{self.port}")
+        if self.workers > 1:
+            print(f"Workers: {self.workers} (SO_REUSEPORT)")
         print(f"Gateway address: 1.1.250")
         print(f"Client addresses: 1.1.128 - 1.1.135")
         print(f"Press Ctrl+C to stop\n")
 
+    def run(self):
+        if self.worker_id == 0:
+            self.print_banner()
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
         try:
+            if self._rx is not None and not self.connected_channels:
+                # Single socket on Linux: let recvmmsg itself do the waiting
+                self.sock.setblocking(True)
+                while True:
+                    self._process_batch(self._rx.recv(self.sock, MSG_WAITFORONE))
+
             while True:
-                data, client_addr = self.sock.recvfrom(2048)
-                print(f"\n[RAW] Received {len(data)} bytes from {client_addr}")
-                print(f"      Hex: {data.hex()}")
-
-                frame = self.parse_header(data)
-                if not frame:
-                    self.log(f"Invalid frame from {client_addr}")
-                    print("      ERROR: Failed to parse header")
-                    continue
+                for key, _ in self.selector.select():
+                    sock = key.fileobj
+                    # Drain everything queued before going back to sleep
+                    # (a DISCONNECT may close a peer socket while it is drained)
+                    while sock.fileno() >= 0:
+                        try:
+                            batch = self._recv_batch(sock)
+                        except OSError as e:
+                            if sock is self.sock:
+                                raise
+                            self._drop_peer_socket(sock, e)
+                            break
+                        self._process_batch(batch)
+                        if len(batch) < RECV_BATCH_SIZE:
+                            break
+
+        except KeyboardInterrupt:
+            print("\n\nShutting down...")
+        finally:
+            for csock in self.peer_socks.values():
+                csock.close()
+            self.peer_socks.clear()
+            self.selector.close()
+            self._probe_sock.close()
+            self.sock.close()
+
+    def run_uring(self):
+        """Serve through io_uring (multishot recvmsg + sendmsg SQEs), falling back to run()."""
+        if not _uring_supported():
+            _logger.warning("io_uring needs Linux >= 6.0; using the selector loop")
+            return self.run()
+        try:
+            uring = _UringUDP(self.sock)
+        except OSError as e:
+            _logger.warning(f"io_uring unavailable ({e}); using the selector loop")
+            return self.run()
 
-                response = None
-                service_type = frame['service_type']
-                body = frame['body']
-
-                if service_type == SERVICE_CONNECT_REQUEST:
-                    response = self.handle_connect_request(body, client_addr)
-                elif service_type == SERVICE_DISCONNECT_REQUEST:
-                    response = self.handle_disconnect_request(body, client_addr)
-                elif service_type == SERVICE_TUNNELING_REQUEST:
-                    response = self.handle_tunneling_request(body, client_addr)
-                elif service_type == SERVICE_CONNECTIONSTATE_REQUEST:
-                    response = self.handle_connectionstate_request(body, client_addr)
-                elif service_type == SERVICE_SEARCH_REQUEST:
-                    # handle_search_request sends directly to HPAI; no response object returned
-                    self.handle_search_request(body, client_addr)
-                elif service_type == SERVICE_TUNNELING_ACK:
-                    # Client acknowledges our TUNNELING_INDICATION - this is expected
-                    if len(body) >= 4:
-                        header_len, channel_id, sequence, status = struct.unpack('BBBB', body[:4])
-                        self.log(f"TUNNELING_ACK received: channel={channel_id}, seq={sequence}, status={status}")
-                    else:
-                        self.log(f"TUNNELING_ACK received (short frame)")
-                else:
-                    self.log(f"Unknown service type: 0x{service_type:04X}")
-
-                if response:
-                    self.sock.sendto(response, client_addr)
+        if self.worker_id == 0:
+            self.print_banner()
+        try:
+            while True:
+                received, send_errors = uring.wait()
+                replies = []
+                for data, client_addr, bid in received:
+                    self._collect(data, client_addr, replies)
+                    uring.release(bid)
+                if replies:
+                    overflow = uring.send(replies)
+                    if overflow:
+                        self._send_batch(overflow)
+                for addr, e in send_errors:
+                    self.log("  → Failed to send to %s: %s", addr, e)
 
         except KeyboardInterrupt:
             print("\n\nShutting down...")
         finally:
+            uring.close()
+            self._probe_sock.close()
             self.sock.close()
 
+    async def run_async(self):
+        """Serve from an asyncio event loop instead of the blocking selector loop."""
+        if self.worker_id == 0:
+            self.print_banner()
+        loop = asyncio.get_running_loop()
+        # Reuse the already bound (non-blocking) socket so socket options are kept
+        transport, _ = await loop.create_datagram_endpoint(lambda: KNXProtocol(self), sock=self.sock)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            transport.close()
+            self._probe_sock.close()
+
+
+class KNXProtocol(asyncio.DatagramProtocol):
+    """asyncio datagram protocol feeding received frames into a KNXSimulator."""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        simulator = self.simulator
+        response = simulator.process_datagram(data, addr)
+        if response:
+            self.transport.sendto(response, addr)
+        for frame, frame_addr in simulator._outbox:
+            self.transport.sendto(frame, frame_addr)
+        simulator._outbox.clear()
+
+
+def _ipv4_address(value):
+    """argparse type: a dotted-quad IPv4 address (hostnames are rejected)."""
+    try:
+        socket.inet_pton(socket.AF_INET, value)
+    except OSError:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a dotted IPv4 address')
+    return value
+
+
+def run_worker(port, verbose, worker_id=0, workers=1, backend='selector', connected_channels=False,
+               rcvbuf=SOCKET_BUFSIZE, reuseport=False, bind='0.0.0.0'):
+    """Create a simulator and serve until interrupted (also the worker process entry point)."""
+    # log() stamps its own (cached) prefix; records need neither thread nor process info
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    logging.basicConfig(stream=sys.stdout, format='%(message)s',
+                        level=logging.INFO if verbose else logging.WARNING)
+    simulator = KNXSimulator(port=port, verbose=verbose, worker_id=worker_id, workers=workers,
+                             connected_channels=connected_channels, rcvbuf=rcvbuf, reuseport=reuseport, bind=bind)
+    if backend == 'asyncio':
+        try:
+            if uvloop is None:
+                asyncio.run(simulator.run_async())
+            elif hasattr(asyncio, 'Runner'):
+                # Python >= 3.11: pass the loop factory (uvloop.install() is deprecated on 3.12+)
+                with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                    runner.run(simulator.run_async())
+            else:
+                uvloop.install()
+                asyncio.run(simulator.run_async())
+        except KeyboardInterrupt:
+            print("\n\nShutting down...")
+    elif backend == 'io_uring':
+        simulator.run_uring()
+    else:
+        simulator.run()
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='KNXnet/IP Gateway Simulator')
     parser.add_argument('--port', type=int, default=3671, help='UDP port (default: 3671)')
+    parser.add_argument('--bind', type=_ipv4_address, default='0.0.0.0',
+                        help='IPv4 address to listen on and advertise in SEARCH_RESPONSE (default: 0.0.0.0)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose logging')
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--asyncio', dest='backend', action='store_const', const='asyncio',
+                         help='Serve from an asyncio event loop (uses uvloop when installed)')
+    backend.add_argument('--io-uring', dest='backend', action='store_const', const='io_uring',
+                         help='Serve through io_uring (Linux >= 6.0, falls back to the selector loop)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes sharing the port via SO_REUSEPORT (default: 1)')
+    parser.add_argument('--connected-channels', action='store_true',
+                        help='Serve each tunnel client from its own connected socket (selector backend only)')
+    parser.add_argument('--rcvbuf', type=int, default=SOCKET_BUFSIZE,
+                        help=f'SO_RCVBUF/SO_SNDBUF size in bytes, 0 keeps the kernel default (default: {SOCKET_BUFSIZE})')
+    parser.add_argument('--reuseport', action='store_true',
+                        help='Set SO_REUSEPORT so separately started simulators can share the port')
+    parser.set_defaults(backend='selector')
     args = parser.parse_args()
+    if not 1 <= args.workers <= 255:
+        parser.error('--workers must be between 1 and 255 (channel ids are one byte)')
+    if (args.reuseport or args.workers > 1 or args.connected_channels) and not hasattr(socket, 'SO_REUSEPORT'):
+        parser.error('--reuseport, --workers and --connected-channels need SO_REUSEPORT, '
+                     'which this platform does not provide')
+    if args.connected_channels and args.backend != 'selector':
+        parser.error('--connected-channels requires the default selector backend')
 
-    simulator = KNXSimulator(port=args.port, verbose=args.verbose)
-    simulator.run()
+    if args.workers > 1:
+        procs = [
+            multiprocessing.Process(target=run_worker,
+                                    args=(args.port, args.verbose, i, args.workers, args.backend,
+                                          args.connected_channels, args.rcvbuf, args.reuseport, args.bind))
+            for i in range(args.workers)
+        ]
+        for proc in procs:
+            proc.start()
+        # forward SIGTERM so workers don't outlive the parent
+        signal.signal(signal.SIGTERM, lambda *_: [proc.terminate() for proc in procs])
+        try:
+            for proc in procs:
+                proc.join()
+        except KeyboardInterrupt:
+            for proc in procs:
+                proc.terminate()
+                proc.join()
+    else:
+        run_worker(args.port, args.verbose, backend=args.backend,
+                   connected_channels=args.connected_channels, rcvbuf=args.rcvbuf, reuseport=args.reuseport,
+                   bind=args.bind)
@@ -15,6 +15,8 @@ Usage:
 """
 
 import subprocess
+import socket
+import struct
 import time
 import signal
 import sys
@@ -22,6 +24,9 @@ import argparse
 import os
 from pathlib import Path
 
+SIMULATOR_ADDR = ("127.0.0.1", 3671)
+SERVICE_SEARCH_REQUEST = 0x0201
+
 class Colors:
     """ANSI color codes for terminal output"""
     GREEN = '\033[92m'
@@ -53,22 +58,21 @@ class TestRunner:
             self.log(f"❌ Simulator not found: {simulator_path}", Colors.RED)
             return False
 
-        cmd = ["python3", str(simulator_path)]
+        # -O: skip __debug__ blocks; no .pyc written next to the sources
+        cmd = ["python3", "-O", str(simulator_path)]
         if self.verbose:
             cmd.append("--verbose")
 
         try:
             self.simulator_process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.PIPE if not self.verbose else None,
-                stderr=subprocess.PIPE if not self.verbose else None,
+                # nobody reads the simulator output, so a pipe would eventually fill and block it
+                stdout=subprocess.DEVNULL if not self.verbose else None,
+                stderr=subprocess.DEVNULL if not self.verbose else None,
+                env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
             )
 
-            # Give simulator time to start
-            time.sleep(1)
-
-            # Check if still running
-            if self.simulator_process.poll() is not None:
+            if not self.wait_for_simulator():
                 self.log("❌ Simulator failed to start", Colors.RED)
                 return False
 
@@ -79,6 +83,31 @@ class TestRunner:
             self.log(f"❌ Failed to start simulator: {e}", Colors.RED)
             return False
 
+    def wait_for_simulator(self, timeout=2.0, interval=0.02):
+        """Probe the simulator with SEARCH_REQUESTs until it answers (or timeout)"""
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            sock.settimeout(interval)
+            ip, port = sock.getsockname()
+            # header + discovery endpoint HPAI (len 8, IPv4/UDP) pointing back at us
+            request = struct.pack(">BBHH", 0x06, 0x10, SERVICE_SEARCH_REQUEST, 14)
+            request += struct.pack(">BB4sH", 0x08, 0x01, socket.inet_aton(ip), port)
+
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if self.simulator_process.poll() is not None:
+                    return False
+                try:
+                    sock.sendto(request, SIMULATOR_ADDR)
+                    sock.recv(64)
+                    return True
+                except socket.timeout:
+                    pass
+                except OSError:
+                    # ICMP port unreachable from an earlier probe: not bound yet
+                    time.sleep(interval)
+        return False
+
     def stop_simulator(self):
         """Stop KNX simulator"""
         if self.simulator_process:
@@ -195,9 +224,6 @@ class TestRunner:
                     self.log("❌ Cannot run integration tests without simulator", Colors.RED)
                     return False
 
-                # Wait a bit for simulator to be ready
-                time.sleep(1)
-
                 if integration:
                     results.append(("Integration Tests", self.run_integration_tests()))
 